@@ -32,45 +32,46 @@ Changelog:
 """
 
 
-import os
 import re
 import schema
 import sys
-from typing import Tuple
-import yaml
-import jinja2
-import pprint
+
+# Shared with (and maintained in) dpt.py.
+from dpt import CLI, load_landscape
 
 
 VERSION = 'v0.1'
 AUTHOR = 'soeren.schmidt@suse.com'
 
+_NAME_RE = re.compile(r'^[a-z.][a-z0-9.-]{1,40}$')
+
+LANDSCAPE_SCHEMA = schema.Schema({
+    object: {
+        "provider": str,
+        "provisioner": str,
+        "location": str,
+        "subnet": str,
+        'name': schema.And(str, 
+                           _NAME_RE.match,
+                           error='"name" must be a string matching "^[a-z.][a-z0-9.-]{1,40}$".'),
+        'keymap': str,
+        'admin_user': str,
+        'admin_user_key': str,
+        'subscription_registration_key': str,
+        'registration_server': str,
+        'enable_root_login': bool,
+        "hosts": [
+            {   'count': schema.And(int, 
+                                    lambda n: isinstance(n, int) and n >= 1,
+                                    error='"count" must be an integer greater than 1'),
+                schema.Optional('infrastructure'): str,
+                schema.Optional('size'): str,
+                schema.Optional('os'): str
+            }
+        ]
+    }
+}, ignore_extra_keys=False)
 
-def error_and_exit(text: str, exitcode: int = 1) -> None:
-    """
-    Writes 'text' to stderr and terminates with 'exitcode'.
-    """
-
-    print(text, file=sys.stderr)
-    sys.exit(exitcode)
-
-
-def load_landscape(file: str) -> dict:
-    """
-    Loads the landscape file (YAML) into a dictionary.
-    Terminates with error message and exit code 2 on failure.
-
-    The landscape file is first rendered by Jinja2, then interpreted
-    as YAML.
-    """
-
-    try: 
-        with open(file) as f:
-            content = yaml.safe_load(jinja2.Template(f.read()).render())
-    except Exception as err:
-        error_and_exit(f'Error reading landscape: {err}', 2)
-    return content
-    
 
 def validate(landscape: dict) -> None:
     """
@@ -81,47 +82,21 @@ def validate(landscape: dict) -> None:
     """
 
 
-    landscape_schema = schema.Schema({
-        object: {
-            "provider": str,
-            "provisioner": str,
-            "location": str,
-            "subnet": str,
-            'name': schema.And(str, 
-                               lambda n: True if re.search('^[a-z.][a-z0-9.-]{1,40}$', n) else False,
-                               error='"name" must be a string matching "^[a-z.][a-z0-9.-]{1,40}$".'),
-            'keymap': str,
-            'admin_user': str,
-            'admin_user_key': str,
-            'subscription_registration_key': str,
-            'registration_server': str,
-            'enable_root_login': bool,
-            "hosts": [
-                {   'count': schema.And(int, 
-                                        lambda n: True if isinstance(n, int) and n >= 1 else False,
-                                        error='"count" must be an integer greater than 1'),
-                    schema.Optional('infrastructure'): str,
-                    schema.Optional('size'): str,
-                    schema.Optional('os'): str
-                }
-            ]
-        }
-    }, ignore_extra_keys=False)
-
     # Validate against schema.
     try:
-        landscape_schema.validate(landscape)
+        LANDSCAPE_SCHEMA.validate(landscape)
     except schema.SchemaError as se:
         msgs = ['Errors during schema validation:'] 
         for err in se.errors + se.autos:
             if err:
                 msgs.append(err)
-        error_and_exit('\n\t'.join(msgs), 2)
+        CLI.exit_on_error('\n\t'.join(msgs), 2)
 
     # Check if providers and provisioners exist.
     hosts_resolved = {}
     for infrastructure in landscape.keys():
-        hosts_resolved[infrastructure] = {}
+        resolved = hosts_resolved[infrastructure] = {}
+        base_name = landscape[infrastructure]['name']
 
         # Check if providers and provisioners exist.
         for attrib in 'provider', 'provisioner': 
@@ -130,10 +105,7 @@ def validate(landscape: dict) -> None:
 
         # Walk through "hosts".
         for definition in  landscape[infrastructure]['hosts']:
-        
-            for index in range(1, definition['count']):
-                name = f'''{landscape[infrastructure]['name']}{index}'''
-                hosts_resolved[infrastructure][name] = definition
+            resolved.update({f'{base_name}{index}': definition for index in range(1, definition['count'] + 1)})
 
 
     print(hosts_resolved)
@@ -142,7 +114,7 @@ def main():
 
     # We allow one optional argument: the landscape definition.
     if len(sys.argv) > 2:
-        error_and_exit(f'Usage: {sys.argv[0]} [LANDSCAPEFILE]\nv{VERSION}')
+        CLI.exit_on_error(f'Usage: {sys.argv[0]} [LANDSCAPEFILE]\nv{VERSION}')
 
     # Load and validate landscape.
     landscape_file = sys.argv[1] if len(sys.argv) == 2 else 'landscape.yaml'
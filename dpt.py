@@ -16,7 +16,6 @@ Ideas:
     - 
 
 ToDo:
-    - We need to capture ^C   (atexit???)
     - Implement 'skip' for provisioner (as soon as we have provisioners coded...)
     - Implementation of "excluded_hosts" for provider and provisioner
       For terraform this can get complicated: https://stackoverflow.com/questions/36403998/avoid-to-destroy-the-previously-created-resources
@@ -38,52 +37,61 @@ Changelog:
                               updates in years. Makes life easier. The function argument_parser()
                               remains, so it can be extended and used again, if docopt gets thrown out.
                             - Implemented showing of provider/provisioner logs.  
+15.10.2026      v0.6        - Back to argparse. Parsing the usage text with docopt on each
+                              call costs more than the whole 'show-*' commands.
 """
 
-import argparse
-from cmath import log
-import concurrent.futures
+import atexit
 import datetime
-import docopt
+import functools
 import os
-import pathlib
-import queue
-import re
-import readchar
-import schema
 import shutil
 import signal
-import subprocess
+import stat
 import sys
-import threading
 import time
-from typing import Tuple, Any
-import yaml
-import jinja2
-
-# CAN BE REMOVED AFTER DEVELOPMENT.
-import pprint
+from typing import Any
 
 
 
 VERSION = 'v0.3'
 AUTHOR = 'soeren.schmidt@suse.com'
 
+LANDSCAPE_CACHE_DIR = 'build/.landscape_cache'
+JINJA_CACHE_DIR = 'build/.jinja_cache'
+SETUP_WORKERS = 8           # threads setting up the build directories
+SPINNER = '-\\|/'           # frames of the progress spinner
+
+# The PIDs of the running providers and provisioners.
+_children = set()
+
 class CLI:
     """
     Class to print colorful text on the command line interface.
     """
 
-    PURPLE = '\033[95m'
-    CYAN = '\033[96m'
-    DARKCYAN = '\033[36m'
-    BLUE = '\033[94m'
-    GREEN = '\033[92m'
-    YELLOW = '\033[93m'
-    RED = '\033[91m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
-    _END = '\033[0m'
+    # No escape sequences if we don't write to a terminal or NO_COLOR is set.
+    _COLOR = sys.stdout.isatty() and not os.environ.get('NO_COLOR')
+
+    PURPLE = '\033[95m' if _COLOR else ''
+    CYAN = '\033[96m' if _COLOR else ''
+    DARKCYAN = '\033[36m' if _COLOR else ''
+    BLUE = '\033[94m' if _COLOR else ''
+    GREEN = '\033[92m' if _COLOR else ''
+    YELLOW = '\033[93m' if _COLOR else ''
+    RED = '\033[91m' if _COLOR else ''
+    BOLD = '\033[1m' if _COLOR else ''
+    UNDERLINE = '\033[4m' if _COLOR else ''
+    _END = '\033[0m' if _COLOR else ''
+
+    # Fixed prefixes, so they don't get assembled on each call.
+    _HEADER_PREFIX = f'\n{BOLD}{UNDERLINE}'
+    _OK_PREFIX = f'[{GREEN} OK {_END}] '
+    _NOTE_PREFIX = f'[{BLUE}NOTE{_END}] {BOLD}'
+    _WARN_PREFIX = f'[{YELLOW}WARN{_END}] '
+    _FAIL_PREFIX = f'[{RED}FAIL{_END}] {BOLD}'
+    _INFO_PREFIX = BLUE + BOLD
+    _IMPORTANT_PREFIX = PURPLE + BOLD
 
     @classmethod
     def print(cls, text: str = '', **kwargs) -> None:
@@ -91,159 +99,267 @@ class CLI:
 
     @classmethod
     def print_info(cls, text: str = '', end: str = '\n') -> None:
-        print(f'{cls.BLUE}{cls.BOLD}{text}{cls._END}', end=end)
+        print(cls._INFO_PREFIX + text + cls._END, end=end)
 
     @classmethod
     def print_important(cls, text: str = '', end: str = '\n') -> None:
-        print(f'{cls.PURPLE}{cls.BOLD}{text}{cls._END}', end=end)
+        print(cls._IMPORTANT_PREFIX + text + cls._END, end=end)
 
     @classmethod
-    def print_fmt(cls, text: str = '', fmt: str = '', end: str = '\n') -> None:
-        print(f'''{fmt}{text}{cls._END if fmt else ''}''', end=end, flush=True)
+    def print_fmt(cls, text: str = '', fmt: str = '', end: str = '\n', flush: bool = False) -> None:
+        print(fmt + text + cls._END if fmt else text, end=end, flush=flush)
 
     @classmethod
     def header(cls, text: str = '') -> None:
-        print(f'\n{cls.BOLD}{cls.UNDERLINE}{text}{cls._END}')
+        print(cls._HEADER_PREFIX + text + cls._END)
 
     @classmethod
     def ok(cls, text: str = '') -> None:
-        print(f'[{cls.GREEN} OK {cls._END}] {text}')
+        print(cls._OK_PREFIX + text)
 
     @classmethod
     def note(cls, text: str = '') -> None:
-        print(f'[{cls.BLUE}NOTE{cls._END}] {cls.BOLD}{text}{cls._END}')
+        print(cls._NOTE_PREFIX + text + cls._END)
 
     @classmethod
     def warn(cls, text: str = '') -> None:
-        print(f'[{cls.YELLOW}WARN{cls._END}] {text}')
+        print(cls._WARN_PREFIX + text)
 
     @classmethod
     def fail(cls, text: str = '') -> None:
-        print(f'[{cls.RED}FAIL{cls._END}] {cls.BOLD}{text}{cls._END}')
+        print(cls._FAIL_PREFIX + text + cls._END)
 
     @classmethod
     def exit_on_error(cls, text: str, exitcode: int = 1):
-        print(f'{cls.RED}{text}{cls._END}', file=sys.stderr)
+        print(cls.RED + text + cls._END, file=sys.stderr)
         sys.exit(exitcode)
 
 
-
-def signal_handler(signal, frame):
-    """ 
-    Terminate with exit code 1.
+class TemplateStream:
+    """
+    File-like wrapper around the output of a Jinja2 template. 
+    The template gets rendered chunk by chunk while YAML reads from it,
+    so the complete rendered document never has to be kept in memory.
     """
-    print(threading.active_count() )
-    time.sleep(3)
 
-def argument_parser() -> object:
+    def __init__(self, template: 'jinja2.Template') -> None:
+        self._chunks = template.generate()
+        self._buffer = ''
+
+    def read(self, size: int = -1) -> str:
+        if size < 0:
+            data = self._buffer + ''.join(self._chunks)
+            self._buffer = ''
+            return data
+        parts, length = [self._buffer], len(self._buffer)
+        for chunk in self._chunks:
+            parts.append(chunk)
+            length += len(chunk)
+            if length >= size:
+                break
+        data = ''.join(parts)
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def terminate_children() -> None:
     """
-    Parses the arguments and return the result object.
+    Terminates all running providers and provisioners. 
+    Each runs in its own session, so the whole process group gets
+    signaled to catch their children (e.g. terraform) as well.
+    Process groups still alive after 2s get killed.
     """
 
-#     parser = argparse.ArgumentParser(prog='dpt', 
-#                                     usage='%(prog)s [--non-interactive] deploy|destroy LANDSCAPE_FILE\n       %(prog)s showlog_provider PROVIDER\n       %(prog)s -h|--help',
-#                                     description='Manages the landscape defined in the landscape file.',
-#                                     epilog='')
-#     parser.add_argument('command', 
-#                         metavar='deploy|destroy',
-#                         choices=['deploy', 'destroy'],
-#                         help='Command to execute.')
-#     parser.add_argument('landscape', 
-#                         metavar='LANDSCAPE_FILE',
-#                         nargs='?',
-#                         default='landscapes/landscape.yaml',
-#                         help='Path to the (YAML) landscape definition.')
-#     parser.add_argument('--non-interactive', 
-#                         dest='interactive',
-#                         action='store_false',
-#                         help='Do not ask for permission before altering the landscape.')
-#     return parser.parse_args()
-
-    description = """
-    Usage:
-    dpt [--non-interactive] (deploy|destroy) LANDSCAPE_FILE
-    dpt [--non-interactive] provide LANDSCAPE_FILE
-    dpt (show-provider|show-provisioner) INFRASTRUCTURE
-    dpt -h|--help
-
-    Arguments:
-    LANDSCAPE_FILE         YAML file describing the landscape. 
-    INFRASTRUCTURE         Name of the infrastructure (part of the landscape)  
-
-    Commands:
-    deploy ...             Deploys the landscape defined by the landscape file.
-    destroy ...            Destroys the landscape defined by the landscape file.
-    provide ...            Provides the landscape defined by the landscape file.
-    show-provider ...      Shows the provider output (log) of the infrastructure.
-    show-provisioner ...   Shows the provisioner output (log) of the infrastructure.
-
-    Options:
-    -h --help              Show this help.
-    --non-interactive      Do not ask for permission before altering the landscape.
-    """
-
-    class MakeObject(object):
-        """
-        Converting the dict into an object to stay compatible with argparse.
-        Also we do some rewrites to stay compatible with older code, that  was
-        programmed with argparse instead of docopt.
-
-        - All keys are lowercase.
-        - We use 'landscape' instead of 'LANDSCAPE_FILE'.
-        - We use 'interactive' instead of '--non-interactive'.
-        - 'command' must be set to the selected command.
-        """
-      
-        def __init__(self, arguments):
-            
-            command = None
-            for key in arguments:
-                if key == 'LANDSCAPE_FILE':
-                    new_key = 'landscape'
-                    value = arguments[key]
-                elif key == '--non-interactive':
-                    new_key = 'interactive'
-                    value = not arguments[key]
-                elif key in ['deploy', 'destroy', 'provide', 'show-provider', 'show-provisioner'] and arguments[key]:
-                    command = key
-                    continue
-                else:
-                    new_key = key
-                    value = arguments[key]
-
-                setattr(self, new_key.lower(), value )
-            
-            if not command:
-                CLI.exit_on_error(f'Could not determine the command!', 2)
-            else:
-                setattr(self, 'command', command)
-        
-        def __str__(self):
-            return str(vars(self))
+    children = list(_children)
+    for pid in children:
+        try:
+            os.killpg(pid, signal.SIGTERM)
+        except OSError:
+            pass
+    deadline = time.time() + 2
+    while children and time.time() < deadline:
+        alive = []
+        for pid in children:
+
+            # Our own children have to be reaped, otherwise they stay as zombies
+            # and their process group never looks dead. Only for processes 
+            # being no child (anymore) the process group gets checked.
+            try:
+                if os.waitpid(pid, os.WNOHANG)[0] == 0:
+                    alive.append(pid)
+            except ChildProcessError:
+                try:
+                    os.killpg(pid, 0)
+                    alive.append(pid)
+                except OSError:
+                    pass
+        children = alive
+        if children:
+            time.sleep(.05)
+    for pid in children:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
 
-    # Parse and return the command line arguments.
-    return MakeObject(docopt.docopt(description, version=f'{VERSION}'))
+def signal_handler(signum, frame):
+    """ 
+    Terminates all running providers and provisioners and exits
+    immediately with exit code 130.
+    """
 
-def spinner_generator() -> str:
+    CLI.print_important('\nInterrupted. Terminating...')
+    terminate_children()
+    sys.stdout.flush()
+    os._exit(130)
+
+def argument_parser() -> 'argparse.Namespace':
     """
-    Returns on each call the next char for a spinner.
+    Parses the arguments and return the result object.
+
+    The result provides:
+        - 'command'         the selected command
+        - 'landscape'       path to the landscape file (None for show-*)
+        - 'infrastructure'  name of the infrastructure (None if not show-*)
+        - 'interactive'     False if '--non-interactive' was given
+        - 'concurrency'     max. number of parallel providers/provisioners (None if not given)
     """
-    spinner = '-\|/'
-    while True:
-        for char in spinner:
-            yield str(char)
+
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='dpt', 
+                                     description='Manages the landscape defined in the landscape file.')
+    parser.add_argument('--version', 
+                        action='version', 
+                        version=VERSION)
+    parser.set_defaults(landscape=None, infrastructure=None)
+
+    # The options are accepted before and after the command. Because a 
+    # subparser would overwrite a value given before the command with its 
+    # default, the copy used by the subparsers has no defaults.
+    options = argparse.ArgumentParser(add_help=False)
+    for target, suppress in [(parser, False), (options, True)]:
+        target.add_argument('--non-interactive', 
+                            dest='interactive',
+                            action='store_false',
+                            default=argparse.SUPPRESS if suppress else True,
+                            help='Do not ask for permission before altering the landscape.')
+        target.add_argument('--concurrency', 
+                            metavar='N',
+                            type=int,
+                            default=argparse.SUPPRESS if suppress else None,
+                            help='Run at most N providers or provisioners at the same time (default: 4 per CPU).')
+    commands = parser.add_subparsers(dest='command', 
+                                     metavar='COMMAND',
+                                     required=True)
+    for command, text in [('deploy', 'Deploys the landscape defined by the landscape file.'),
+                          ('destroy', 'Destroys the landscape defined by the landscape file.'),
+                          ('provide', 'Provides the landscape defined by the landscape file.')]:
+        command_parser = commands.add_parser(command, help=text, description=text, parents=[options])
+        command_parser.add_argument('landscape', 
+                                    metavar='LANDSCAPE_FILE',
+                                    help='YAML file describing the landscape.')
+    for command, text in [('show-provider', 'Shows the provider output (log) of the infrastructure.'),
+                          ('show-provisioner', 'Shows the provisioner output (log) of the infrastructure.')]:
+        command_parser = commands.add_parser(command, help=text, description=text, parents=[options])
+        command_parser.add_argument('infrastructure', 
+                                    metavar='INFRASTRUCTURE',
+                                    help='Name of the infrastructure (part of the landscape).')
+
+    # Parse and return the command line arguments. argparse (and its 
+    # subparsers) exit with 2 on usage errors, but for us 2 means issues
+    # with the landscape.
+    try:
+        args = parser.parse_args()
+        if args.concurrency is not None and args.concurrency < 1:
+            parser.error('--concurrency must be at least 1')
+    except SystemExit as exit:
+        sys.exit(1 if exit.code == 2 else exit.code)
+    return args
 
 def wait_for_key(text: str, mapping: dict) -> Any:
     """
     Prints the text and waits for the keys defined in the mapping
     and returns the associate string after the key has been pressed.
+    Terminates with exit code 130 on ^C.
     """
 
+    import termios      # only needed in interactive mode
+
+    if not sys.stdin.isatty():
+        CLI.exit_on_error('No terminal to ask for permission. Use "--non-interactive".', 1)
     CLI.print_important(f'\n{text}')
-    while True:
-        k = readchar.readkey()
-        if k in mapping.keys():
-            return mapping[k]
+
+    # The terminal gets switched only once to read single keys without echo.
+    # Because ^C arrives as a key as well, the terminal can be restored 
+    # before terminating.
+    fd = sys.stdin.fileno()
+    old_mode = termios.tcgetattr(fd)
+    mode = termios.tcgetattr(fd)
+    mode[3] &= ~(termios.ECHO | termios.ICANON | termios.ISIG)
+    mode[6][termios.VMIN] = 1
+    mode[6][termios.VTIME] = 0
+    try:
+        termios.tcsetattr(fd, termios.TCSAFLUSH, mode)
+        while True:
+            k = os.read(fd, 1)     # blocks until a key gets pressed
+            if k in (b'', b'\x03'):
+                break
+            k = k.decode(errors='ignore')
+            if k in mapping:
+                return mapping[k]
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_mode)
+    signal_handler(signal.SIGINT, None)
+
+@functools.lru_cache(maxsize=None)
+def jinja_environment(dirname: str) -> 'jinja2.Environment':
+    """
+    Returns the Jinja2 environment for the given template directory.
+    The environment gets created only once per directory, so compiled
+    templates are kept and reused. Compiled templates also get stored
+    in the build directory to be reused by the next runs, but only if
+    the build directory exists already. Helpers like render.py must not
+    create it in a directory not initialized for DPT.
+    """
+
+    import jinja2
+
+    bytecode_cache = None
+    if os.path.isdir(os.path.dirname(JINJA_CACHE_DIR)):
+        try:
+            os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(JINJA_CACHE_DIR)
+        except OSError:
+            pass
+
+    # The loader keeps the state of each file it served (or could not find),
+    # so a cached landscape can be checked against exactly these files.
+    loader = jinja2.FileSystemLoader(dirname)
+    loader.served = {}
+    get_source = loader.get_source
+    def recording_get_source(environment, template):
+        path = os.path.abspath(os.path.join(dirname, *template.split('/')))
+        loader.served[path] = file_state(path)     # before reading, so a later change is noticed
+        return get_source(environment, template)
+    loader.get_source = recording_get_source
+
+    return jinja2.Environment(loader=loader, 
+                              bytecode_cache=bytecode_cache,
+                              cache_size=400, 
+                              auto_reload=False)
+
+def file_state(path: str) -> Any:
+    """
+    Returns size and modification time of the file or None if 
+    it does not exist (or is not accessible).
+    """
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
 
 def load_landscape(file: str) -> dict:
     """
@@ -253,15 +369,73 @@ def load_landscape(file: str) -> dict:
     The landscape file is first rendered by Jinja2, then interpreted
     as YAML. THe directory where the file is in, will be used as a 
     template directory for Jinja2. Therefore extending and including 
-    is possible.
+    is possible. Files without any Jinja2 markers are parsed directly.
+
+    The result gets cached in the build directory (if it exists), so an
+    unchanged landscape does not need to be rendered and parsed again.
+    Along with it the state of each file it was generated from is stored,
+    which is only the landscape file itself for plain YAML.
     """
 
     CLI.header('Load landscape')
+
+    # The Rust based ryaml is faster than PyYAML, but follows YAML 1.2
+    # (e.g. 'yes' and 'no' are strings, not booleans), so it has to be
+    # requested explicitly.
+    parser = os.environ.get('DPT_YAML_PARSER', 'pyyaml')
+    if parser not in ('pyyaml', 'ryaml'):
+        CLI.exit_on_error(f'Unknown YAML parser "{parser}" in DPT_YAML_PARSER. Use "pyyaml" or "ryaml".', 2)
+    if parser == 'ryaml':
+        try:
+            import ryaml
+        except ImportError:
+            CLI.exit_on_error('DPT_YAML_PARSER is "ryaml", but ryaml is not installed.', 2)
+
+    # Each landscape file has its own slot in the cache, which is only 
+    # valid as long as the parser is the same and none of the files the
+    # landscape was generated from has changed.
+    use_cache = os.path.isdir(os.path.dirname(LANDSCAPE_CACHE_DIR))
+    if use_cache:
+        import hashlib
+        import pickle
+        cache_file = f'{LANDSCAPE_CACHE_DIR}/{hashlib.sha256(os.path.abspath(file).encode()).hexdigest()}.pickle'
+        try:
+            with open(cache_file, 'rb') as f:
+                cached_parser, states, content = pickle.load(f)
+            if cached_parser == parser and content and all(file_state(path) == state for path, state in states.items()):
+                CLI.ok(f'Landscape "{file}" loaded from cache.')
+                return content
+        except Exception:
+            pass
+
+    # PyYAML uses the libyaml bindings if available, which are a lot 
+    # faster than the pure Python implementation.
+    if parser == 'pyyaml':
+        import yaml
+        if yaml.__with_libyaml__:
+            loader = yaml.CSafeLoader
+        else:
+            loader = yaml.SafeLoader
+            CLI.warn('PyYAML comes without libyaml bindings. Falling back to the slower pure Python parser.')
     try: 
-        dirname, filename = os.path.split(file)
-        env = jinja2.Environment(loader=jinja2.FileSystemLoader(dirname))
-        template = env.get_template(filename)
-        content = yaml.safe_load(template.render())
+
+        # Plain YAML without any Jinja2 markers can be parsed directly.
+        states = {os.path.abspath(file): file_state(file)}
+        with open(file, 'rb') as f:
+            raw = f.read()
+        if b'{{' in raw or b'{%' in raw or b'{#' in raw:
+            dirname, filename = os.path.split(file)
+            environment = jinja_environment(dirname)
+            template = environment.get_template(filename)
+            if parser == 'ryaml':
+                content = ryaml.loads(template.render())
+            else:
+                content = yaml.load(TemplateStream(template), Loader=loader)
+            states = dict(environment.loader.served)
+        elif parser == 'ryaml':
+            content = ryaml.loads(raw.decode())
+        else:
+            content = yaml.load(raw, Loader=loader)
     except Exception as err:
         CLI.exit_on_error(f'Error reading landscape: {err}', 2)
 
@@ -269,14 +443,38 @@ def load_landscape(file: str) -> dict:
     if not content:
         CLI.exit_on_error(f'The landscape "{file}" is empty!', 2)
 
+    # Update the cache. If this fails, we simply have no cache next time.
+    if use_cache:
+        try:
+            os.makedirs(LANDSCAPE_CACHE_DIR, exist_ok=True)
+            with open(f'{cache_file}.{os.getpid()}', 'wb') as f:
+                pickle.dump((parser, states, content), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f'{cache_file}.{os.getpid()}', cache_file)
+        except Exception as err:
+            CLI.warn(f'Could not cache landscape: {err}')
+
     CLI.ok(f'Landscape "{file} loaded successfully.')
     return content
     
+@functools.lru_cache(maxsize=None)
+def is_executable(path: str) -> bool:
+    """
+    Returns True if path is a regular file with an executable bit set.
+    A single stat() is needed for this and the result gets cached, 
+    because usually many infrastructures share the same providers.
+    """
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and bool(st.st_mode & 0o111)
+
 def validate(landscape: dict, base_path: str) -> dict:
     """
-    After schema validation additional checks are done not
+    After the schema validation additional checks are done not
     (easy) possible with a schema.
-    The schema here only validates the parts needed to call 
+    The schema check here only validates the parts needed to call 
     the provider. It is in the responsibility of the provider
     to do additional verifications.
     Also it builds up a deployment dictionary with the details
@@ -287,21 +485,25 @@ def validate(landscape: dict, base_path: str) -> dict:
 
     CLI.header('Validate landscape')
 
-    landscape_schema = schema.Schema({
-        object: {
-            'provider': str,
-            'hosts': list,
-        }
-    }, ignore_extra_keys=True)
+    # Validate the structure. It is simple enough to be checked 
+    # directly without the overhead of a schema library.
+    if not isinstance(landscape, dict):
+        CLI.exit_on_error('Errors during schema validation:\n\tThe landscape must be a dictionary of infrastructures.', 2)
+    msgs = ['Errors during schema validation:'] 
+    for name, config in landscape.items():
 
-    # Validate against schema.
-    try:
-        landscape_schema.validate(landscape)
-    except schema.SchemaError as se:
-        msgs = ['Errors during schema validation:'] 
-        for err in se.errors + se.autos:
-            if err:
-                msgs.append(err)
+        # The name is used as directory in the build directory.
+        if not isinstance(name, str) or name in ('', '.', '..') or '/' in name:
+            msgs.append(f'Infrastructure name {name!r} must be a string usable as directory name.')
+            continue
+        if not isinstance(config, dict):
+            msgs.append(f'Infrastructure "{name}" must be a dictionary.')
+            continue
+        if not isinstance(config.get('provider'), str):
+            msgs.append(f'Infrastructure "{name}": "provider" must be a string.')
+        if not isinstance(config.get('hosts'), list):
+            msgs.append(f'Infrastructure "{name}": "hosts" must be a list.')
+    if len(msgs) > 1:
         CLI.exit_on_error('\n\t'.join(msgs), 2)
     CLI.ok('Schema validation passed.')
 
@@ -309,36 +511,37 @@ def validate(landscape: dict, base_path: str) -> dict:
     infrastructures = {}
     msgs = ['Error during provider validation:']
     errors = False
+    project_path = os.getcwd()
+    build_base = os.path.join(project_path, 'build')
+    providers_dir = os.path.join(base_path, 'Deployment', 'providers')
+    provisioners_dir = os.path.join(base_path, 'Provisioning', 'provisioners')
     for name, config in landscape.items():
 
-        build_dir = f'{os.getcwd()}/build/{name}'
+        build_dir = os.path.join(build_base, name)
 
         # Generate a few needed provider data.
-        try:
-            provider_name, provider_args = config['provider'].split()
-        except ValueError:
-            provider_name = config['provider']
-            provider_args = None
-        provider_dir = f'''{base_path}/Deployment/providers/{provider_name}'''
-        provider_path = f'{provider_dir}/provider'
-        if not ( os.path.exists(provider_path) and os.access(provider_path, os.X_OK) ):
+        provider_name, _, provider_args = config['provider'].partition(' ')
+        provider_args = provider_args.strip() or None
+        provider_dir = os.path.join(providers_dir, provider_name)
+        provider_path = os.path.join(provider_dir, 'provider')
+        if not is_executable(provider_path):
             msgs.append(f'''Provider "{config['provider']}": No executable "{provider_path}".''')
             errors = True
-            continue 
         
         # Generate a few needed provisioner data.
-        try:
-            provisioner_name, provisioner_args = config['provisioner'].split()
-        except ValueError:
-            provisioner_name = config['provisioner']
-            provisioner_args = None
-        provisioner_dir = f'''{base_path}/Provisioning/provisioners/{provisioner_name}'''
-        provisioner_path = f'{provisioner_dir}/provisioner'
-        provisioner_config = f'''{build_dir}/config_provisioner'''
-        if not ( os.path.exists(provisioner_path) and os.access(provisioner_path, os.X_OK) ):
+        provisioner_name, _, provisioner_args = config['provisioner'].partition(' ')
+        provisioner_args = provisioner_args.strip() or None
+        provisioner_dir = os.path.join(provisioners_dir, provisioner_name)
+        provisioner_path = os.path.join(provisioner_dir, 'provisioner')
+        provisioner_config = os.path.join(build_dir, 'config_provisioner')
+        if not is_executable(provisioner_path):
             msgs.append(f'''Provisioner "{config['provisioner']}": No executable "{provisioner_path}".''')
             errors = True
-            continue 
+
+        # No need to go on, if something is missing. All errors
+        # get reported after all infrastructures have been checked.
+        if errors:
+            continue
 
         # Enhance infrastructure with the generated data.
         infrastructures[name] = {}
@@ -350,7 +553,7 @@ def validate(landscape: dict, base_path: str) -> dict:
         infrastructures[name]['provider_args'] = provider_args
         infrastructures[name]['build_dir'] = build_dir
         infrastructures[name]['config']['name'] = name
-        infrastructures[name]['project_path'] = os.getcwd()
+        infrastructures[name]['project_path'] = project_path
         CLI.ok(f'Infrastructure "{name}" configured.')
     if errors: 
         CLI.exit_on_error('\n\t'.join(msgs), 2)
@@ -358,81 +561,210 @@ def validate(landscape: dict, base_path: str) -> dict:
 
     return infrastructures
 
+def is_json_compatible(data: Any) -> bool:
+    """
+    Returns True if the data can be written as JSON and gets read back
+    unchanged by a YAML parser. This is not the case for mapping keys 
+    other than strings (JSON turns them into strings), values other than 
+    dictionaries, lists, strings, numbers, booleans and None (e.g. dates),
+    infinite floats, NaN and characters YAML only accepts escaped.
+    """
+
+    import math
+    import re
+
+    # Characters JSON writes unescaped, but YAML does not accept in a document.
+    not_printable = re.compile('[\x7f-\x84\x86-\x9f\ud800-\udfff\ufffe\uffff]')
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            for key in item:
+                if not isinstance(key, str) or not_printable.search(key):
+                    return False
+            stack.extend(item.values())
+        elif isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, str):
+            if not_printable.search(item):
+                return False
+        elif isinstance(item, float):
+            if not math.isfinite(item):
+                return False
+        elif item is not None and not isinstance(item, (int, bool)):
+            return False
+    return True
+
+def write_provider_config(info: dict) -> None:
+    """
+    Creates the build directory of the infrastructure and writes 
+    the provider configuration into it.
+    The configuration is written as JSON, which is a lot faster than
+    dumping YAML and still can be read by any YAML parser. Only if JSON
+    can't represent the configuration unchanged (e.g. dates or numbers
+    as keys), it gets dumped as YAML.
+    """
+
+    import json
+
+    build_dir = info['build_dir']
+    os.makedirs(build_dir, mode=0o700, exist_ok=True)
+    with open(f'{build_dir}/config_provider', 'w', encoding='utf-8', buffering=65536) as f: 
+        if is_json_compatible(info):
+            json.dump(info, f, separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+        else:
+            import yaml
+            dumper = yaml.CSafeDumper if yaml.__with_libyaml__ else yaml.SafeDumper
+            yaml.dump(info, f, Dumper=dumper, default_flow_style=None, sort_keys=False)
+
 def setup_infrastructures(infrastructures: dir) -> None:
     """
     Creates the necessary files for the infrastructures.
 
     Terminates with error message and exit code 2 on failure.
     """
+
     CLI.header('Set up infrastructures')
-    for infrastructure in infrastructures:
-        try:
-            if not os.path.exists(infrastructures[infrastructure]['build_dir']):
-                os.mkdir(infrastructures[infrastructure]['build_dir'], mode = 0o700)
-            with open(f'''{infrastructures[infrastructure]['build_dir']}/config_provider''', 'w') as f: 
-                f.write(yaml.safe_dump(infrastructures[infrastructure]))
-        except Exception as err:
-            CLI.exit_on_error(f'Error setting up build directory for infrastructure "{infrastructure}": {err}', 2)
-        CLI.ok(f'''Build directory for infrastructure "{infrastructure}" has bee set up at "{infrastructures[infrastructure]['build_dir']}".''')
 
-def execute(task_definition: Tuple, q) -> None:
+    # Setting up the build directories is mostly waiting for the disk,
+    # so it is done by a few threads to overlap the latencies.
+    import concurrent.futures
+    with concurrent.futures.ThreadPoolExecutor(max_workers=SETUP_WORKERS) as executor:
+        jobs = {infrastructure: executor.submit(write_provider_config, info) for infrastructure, info in infrastructures.items()}
+        errors = {infrastructure: job.exception() for infrastructure, job in jobs.items()}
+
+    # All failed infrastructures get reported at once.
+    msgs = ['Errors setting up build directories:']
+    for infrastructure, info in infrastructures.items():
+        if errors.get(infrastructure):
+            msgs.append(f'Infrastructure "{infrastructure}": {errors[infrastructure]}')
+            continue
+        CLI.ok(f'''Build directory for infrastructure "{infrastructure}" has bee set up at "{info['build_dir']}".''')
+    if len(msgs) > 1:
+        CLI.exit_on_error('\n\t'.join(msgs), 2)
+
+async def execute(category: str, command: str, info: dict, slots: 'asyncio.Semaphore', active: set) -> bool:
     """
-    Calls the given executable with the command and the config file as listed
-    in the given tuple.
-    We wait until the process returns. All output gets captured and we print 
-    an info about the running process periodically to show life.
+    Calls the provider or provisioner (category) of the infrastructure 
+    described by info with the command, as soon as one of the slots is free.
+    While holding the slot, the infrastructure is listed in active.
+    We wait until the process returns. All output gets written by the process
+    directly into the output file in the build directory.
+
+    Returns True if the executable terminated successfully else False.
     """
 
-    category, name, provider_dir, command, build_dir = task_definition
-    executable = f'{provider_dir}/{category}'
+    import asyncio
 
-    try:
-        start = time.time()
-        output_file = open(f'{build_dir}/output_{category}', 'w')
-        with subprocess.Popen([executable, command],
-                              stdout=output_file, 
-                              stderr = subprocess.STDOUT,
-                              cwd=build_dir,  
-                             ) as proc:
+    name = info['config']['name']
+    build_dir = info['build_dir']
+    executable = f'''{info[f'{category}_dir']}/{category}'''
+
+    async with slots:
+        active.add(name)
+        try:
+            start = time.time()
+            output_fd = os.open(f'{build_dir}/output_{category}', os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+            try:
+                proc = await asyncio.create_subprocess_exec(executable, command,
+                                                            stdout=output_fd, 
+                                                            stderr=asyncio.subprocess.STDOUT,
+                                                            cwd=build_dir,  
+                                                            close_fds=True,
+                                                            start_new_session=True,
+                                                           )
+            finally:
+                os.close(output_fd)     # the process has its own copy
+            # A job cancelled because another one raised, keeps its PID 
+            # in the list, so the process gets terminated on exit.
+            _children.add(proc.pid)
             CLI.print_info(f'[{datetime.datetime.now()}] {category.capitalize()} for "{name}" has been started. (PID: {proc.pid})')
-            proc.wait()
-        output_file.close()
-        end = time.time()
-        if proc.returncode == 0:
-            CLI.ok(f'{category.capitalize()} for "{name}" has terminated successfully. (Executed in {round(end-start, 1)}s)')
-        else:
+            await proc.wait()
+            _children.discard(proc.pid)
+            end = time.time()
+            if proc.returncode == 0:
+                CLI.ok(f'{category.capitalize()} for "{name}" has terminated successfully. (Executed in {round(end-start, 1)}s)')
+                return True
             CLI.fail(f'{category.capitalize()} for "{name}" failed with exit code {proc.returncode}! (Executed in {round(end-start, 1)}s)\n\t-> Run "./dpt show-{category} {name}" for details')
-            q.put(True)
-    except Exception as err:
-        CLI.fail(f'Could not execute {category} for landscape "{name}": {err}')
-        q.put(True)
+        except Exception as err:
+            CLI.fail(f'Could not execute {category} for landscape "{name}": {err}')
+        finally:
+            active.discard(name)
+    return False
+
+async def show_progress(pending: set, active: set, total: int) -> None:
+    """
+    Redraws the spinner with the number of running jobs and the number
+    of jobs waiting for a slot 10 times a second until it gets cancelled.
+    """
+
+    import asyncio
+
+    # Only the changing fields get formatted for each frame.
+    line = f'{CLI.BOLD}{CLI.CYAN}Running: {{}}/{total}, waiting: {{}} ({{:.1f}}s) {{}}{CLI._END}\r'
+    start = time.time()
+    tick = 0
+    while True:
+        running = len(active)
+        sys.stdout.write(line.format(running, len(pending) - running, time.time() - start, SPINNER[tick & 3]))
+        sys.stdout.flush()      # once per frame, also for the lines printed by the jobs meanwhile
+        tick += 1
+        await asyncio.sleep(.1)
+
+async def supervise(category: str, command: str, infrastructures: dict, max_parallel: int) -> int:
+    """
+    Runs the provider or provisioner (category) with the command for all 
+    infrastructures, at most max_parallel at the same time,
+    and waits for them while a separate task shows the progress.
+    All processes are supervised by the event loop, no threads are needed.
+
+    Returns the number of failed jobs.
+    """
+
+    import asyncio
 
-def fire_threads(call_list: list) -> bool:
+    # Up to Python 3.11 asyncio waits for each process in a thread of its own.
+    # Where the kernel supports pidfds (Linux 5.3+), we let the event loop
+    # watch the processes itself, which Python 3.12 does by default.
+    if sys.version_info < (3, 12) and hasattr(asyncio, 'PidfdChildWatcher'):
+        try:
+            os.close(os.pidfd_open(os.getpid()))
+            watcher = asyncio.PidfdChildWatcher()
+            watcher.attach_loop(asyncio.get_running_loop())
+            asyncio.set_child_watcher(watcher)
+        except (AttributeError, OSError):
+            pass
+
+    slots = asyncio.Semaphore(max_parallel)
+    active = set()
+    pending = {asyncio.create_task(execute(category, command, info, slots, active)) for info in infrastructures.values()}
+    failed = 0
+    progress = asyncio.create_task(show_progress(pending, active, len(infrastructures)))
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending -= done
+            failed += sum(not job.result() for job in done)    # raises the exception of a job, if any
+    finally:
+        progress.cancel()
+    return failed
+
+def fire_threads(category: str, command: str, infrastructures: dict, max_parallel: int) -> bool:
     """
-    Start all threads in the call list in parallel and waiting for termination.
+    Start the provider or provisioner (category) with the command for all 
+    infrastructures in parallel and waiting for termination.
+    At most max_parallel jobs run at the same time.
     The progress will be shown by a spinner.
 
-    Returns True if *all* threads terminated successfully else False.
+    Returns True if *all* jobs terminated successfully else False.
     """
+
+    import asyncio
+
     try:              
-        q = queue.Queue()
-        jobs = [threading.Thread(target=execute, args=(params, q)) for params in call_list]
-        for job in jobs:
-            job.start()
-        spinner = spinner_generator()
-        start = time.time()
-        while len(jobs) > 0:
-            for job in jobs:
-                CLI.print_fmt(f'Running: {len(jobs)}/{len(call_list)} ({round(time.time()-start,1)}s) {next(spinner)}', fmt=CLI.BOLD+CLI.CYAN, end='\r')
-                if not job.is_alive():
-                    jobs.remove(job)
-                time.sleep(.1)
-        thread_errors  = [q.get() for _ in range(q.qsize())]       
-        if True in thread_errors:
-            return False
+        return asyncio.run(supervise(category, command, infrastructures, max_parallel)) == 0
     except Exception as err:
         CLI.exit_on_error(f'[{datetime.datetime.now()}] Fatal error during execution: {err}', 3)
-    return True
 
 def show_log(path: str) -> None:
     """
@@ -440,23 +772,29 @@ def show_log(path: str) -> None:
     """
 
     try:
-        with open(path, 'r') as f:
-            for line in f.readlines():
-                print(line.strip())
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, sys.stdout.buffer)
     except Exception as err:
         CLI.exit_on_error(f'Error reading log for infrastructure: {err}', 3)
 
 
 def main():
 
-    # Terminate nicely at ^C.
+    # Showing a log needs neither the full argument parsing nor the 
+    # landscape, so it gets handled right away.
+    if len(sys.argv) == 3 and sys.argv[1] in ('show-provider', 'show-provisioner') and not sys.argv[2].startswith('-'):
+        show_log(f'./build/{sys.argv[2]}/output_{sys.argv[1][5:]}')
+        sys.exit(0)
+
+    # Terminate nicely at ^C and never leave providers/provisioners behind.
     signal.signal(signal.SIGINT, signal_handler)
+    atexit.register(terminate_children)
 
     # Parsing arguments.
     args = argument_parser()
 
     # Extract DTP base path from the link of this script.
-    base_path = os.path.dirname(pathlib.Path(sys.argv[0]).resolve())
+    base_path = os.path.dirname(os.path.realpath(sys.argv[0]))
 
     # We shall show the results of a provider run.
     if args.command == 'show-provider':
@@ -480,6 +818,10 @@ def main():
     # so we ask for permission.
     if args.interactive and not wait_for_key("Shall we deploy? [Y|n]", { 'Y': True, 'n': False}):
         CLI.exit_on_error('User interruption. Terminating.', 2)
+
+    # Limit the number of providers and provisioners running in parallel
+    # for large landscapes.
+    max_parallel = args.concurrency or min(len(infrastructures), (os.cpu_count() or 1) * 4)
     
     # We shall do something with the provider.
     if args.command in ['deploy', 'destroy']:
@@ -490,7 +832,7 @@ def main():
         CLI.header('Execute providers')
 
         # Calling the providers of each infrastructure.
-        if not fire_threads([('provider', name, data['provider_dir'], args.command, data['build_dir']) for name, data in infrastructures.items()]):
+        if not fire_threads('provider', args.command, infrastructures, max_parallel):
             CLI.exit_on_error(f'[{datetime.datetime.now()}] Deployment failed', 3)
 
         # Bye.
@@ -503,16 +845,13 @@ def main():
         CLI.header('Execute provisioners')
 
         # Calling the provisioners of each infrastructure.
-        if not fire_threads([('provisioner', name, data['provisioner_dir'], args.command, data['build_dir']) for name, data in infrastructures.items()]):
+        if not fire_threads('provisioner', args.command, infrastructures, max_parallel):
             CLI.exit_on_error(f'[{datetime.datetime.now()}] Provisioning failed.', 3)
 
         # Bye.
         CLI.print_info(f'[{datetime.datetime.now()}] Provisioning finished')
         sys.exit(0)
 
-    # Bye.
-    CLI.exit_on_error(f'No action done. Command "{args.command}" seems to be unknown...', 2)
-
 
 if __name__ == '__main__':
     main()
@@ -1,18 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import os
 import pprint
 import sys
 import yaml
-import jinja2
+from dpt import jinja_environment
 
 
 def main():
     try: 
-        with open(sys.argv[1]) as f:
-            content = jinja2.Template(f.read()).render()
-            print(content)
-            landscape = yaml.safe_load(content)
+        dirname, filename = os.path.split(sys.argv[1])
+        content = jinja_environment(dirname).get_template(filename).render()
+        print(content)
+        landscape = yaml.load(content, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
     except Exception as err:
         print(f'Error reading landscape: {err}', file=sys.stderr)
         sys.exit(1)